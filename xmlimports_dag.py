@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python_operator import PythonOperator
-import mmenacer_script
+import xmlimports_python_script
 
 default_args = {
     'owner': 'airflow',
@@ -14,17 +14,36 @@ default_args = {
 dag = DAG(
     'my_python_script',
     default_args=default_args,
-    schedule_interval='*/5 * * * *',
+    schedule_interval=None,
     catchup=False
 )
 
-script_path = './xmlimports_python_script.py'
+parse_xml = PythonOperator(
+    task_id='parse_xml',
+    python_callable=xmlimports_python_script.parse_xml,
+    dag=dag,
+)
 
-run_my_script = PythonOperator(
-    task_id='run_my_script',
-    python_callable=mmenacer_script.main,
-    op_kwargs={'script_path': script_path},
+# The insert tasks share the 'neo4j_writers' pool, which bounds the number
+# of concurrent Bolt connections. Create it before enabling the DAG:
+#   airflow pools set neo4j_writers 4 "Neo4j write tasks"
+insert_protein = PythonOperator(
+    task_id='insert_protein',
+    python_callable=xmlimports_python_script.insert,
+    op_kwargs={'label': 'protein'},
+    pool='neo4j_writers',
     dag=dag,
 )
 
-run_my_script
+parse_xml >> insert_protein
+
+for label in ('gene', 'feature', 'reference', 'fullname', 'organism'):
+    insert_task = PythonOperator(
+        task_id=f'insert_{label}',
+        python_callable=xmlimports_python_script.insert,
+        op_kwargs={'label': label},
+        pool='neo4j_writers',
+        dag=dag,
+    )
+
+    insert_protein >> insert_task
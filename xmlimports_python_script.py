@@ -1,5 +1,117 @@
-from neo4j import GraphDatabase
-import xmltodict as xd
+import asyncio
+import csv
+import os
+import subprocess
+
+from neo4j import AsyncGraphDatabase, AsyncManagedTransaction, AsyncSession
+from neo4j.exceptions import ClientError
+from lxml import etree
+
+
+NS = '{http://uniprot.org/uniprot}'
+NAMESPACES = {'u': 'http://uniprot.org/uniprot'}
+
+XPATH_NAMES = etree.XPath('u:name', namespaces=NAMESPACES)
+XPATH_POSITION = etree.XPath('u:location/u:position/@position', namespaces=NAMESPACES, smart_strings=False)
+XPATH_CITATION_TYPE = etree.XPath('string(u:citation/@type)', namespaces=NAMESPACES, smart_strings=False)
+XPATH_CITATION_NAME = etree.XPath('string(u:citation/@name)', namespaces=NAMESPACES, smart_strings=False)
+XPATH_AUTHORS = etree.XPath('u:citation/u:authorList/u:person/@name', namespaces=NAMESPACES, smart_strings=False)
+XPATH_FULLNAME = etree.XPath('u:recommendedName/u:fullName/text()', namespaces=NAMESPACES, smart_strings=False)
+
+# Selection applied by the inserts, as sets for hashed membership tests.
+GENE_TARGETS = frozenset({('synonym', 'HNF3B'), ('primary', 'FOXA2')})
+FEATURE_POSITION = '307'
+FEATURE_TARGETS = frozenset({('Phosphoserine', 'modified residue')})
+FULLNAME_TARGETS = frozenset({"Hepatocyte nuclear factor 3-beta"})
+ORGANISM_TARGETS = frozenset({'Homo sapiens'})
+ORGANISM_TAXONOMY_ID = "9606"
+
+# Files written by XMLImporter.to_csv, in neo4j-admin import header format.
+CSV_NODES = (
+    ('Protein', 'proteins.csv'),
+    ('Gene', 'genes.csv'),
+    ('Feature', 'features.csv'),
+    ('Reference', 'references.csv'),
+    ('Author', 'authors.csv'),
+    ('FullName', 'fullnames.csv'),
+    ('Organism', 'organisms.csv')
+)
+CSV_RELATIONSHIPS = (
+    ('FROM_GENE', 'from_gene.csv'),
+    ('HAS_FEATURE', 'has_feature.csv'),
+    ('HAS_REFERENCE', 'has_reference.csv'),
+    ('HAS_AUTHOR', 'has_author.csv'),
+    ('HAS_FULL_NAME', 'has_full_name.csv'),
+    ('IN_ORGANISM', 'in_organism.csv')
+)
+
+CYPHER_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS FOR (p:Protein) ON (p.id_protein)",
+    "CREATE INDEX IF NOT EXISTS FOR (g:Gene) ON (g.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (f:Feature) ON (f.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (r:Reference) ON (r.id)",
+    "CREATE INDEX IF NOT EXISTS FOR (a:Author) ON (a.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (f:FullName) ON (f.name)",
+    "CREATE INDEX IF NOT EXISTS FOR (o:Organism) ON (o.taxonomy_id)"
+)
+
+CYPHER_APOC_HELP = "CALL apoc.help('periodic')"
+
+CYPHER_APOC_ITERATE = """
+CALL apoc.periodic.iterate(
+    "MATCH (p:Protein {id_protein: $id_protein}) UNWIND $rows AS row RETURN p, row",
+    $query,
+    {batchSize: 1000, parallel: false, retries: 3, params: $params}
+)
+"""
+
+CYPHER_PROTEIN_ROWS = "MATCH (p:Protein {id_protein: $id_protein})\nUNWIND $rows AS row\n"
+
+CYPHER_PROTEIN = "MERGE (p:Protein {id_protein: $id_protein})"
+
+CYPHER_GENE = """
+MATCH (p:Protein {id_protein: $id_protein})
+UNWIND $rows AS row
+WITH p, row WHERE [row.type, row.text] IN $targets
+MERGE (g:Gene {name: row.text})
+MERGE (p)-[:FROM_GENE]->(g)
+"""
+
+# Applied per row by run_batched, which binds p and row.
+CYPHER_FEATURE = """
+WITH p, row WHERE row.position = $position
+AND [row.description, row.type] IN $targets
+MERGE (f:Feature {name: row.description, type: row.type})
+MERGE (p)-[:HAS_FEATURE]->(f)
+"""
+
+# Applied per row by run_batched, which binds p and row.
+CYPHER_REFERENCE = """
+MERGE (r:Reference {id: row.id})
+ON CREATE SET r.type = row.type, r.name = row.name
+MERGE (p)-[:HAS_REFERENCE]->(r)
+FOREACH (author IN row.authors |
+    MERGE (a:Author {name: author})
+    MERGE (r)-[:HAS_AUTHOR]->(a)
+)
+"""
+
+CYPHER_FULLNAME = """
+MATCH (p:Protein {id_protein: $id_protein})
+UNWIND $rows AS name
+WITH p, name WHERE name IN $targets
+MERGE (f:FullName {name: name})
+MERGE (p)-[:HAS_FULL_NAME]->(f)
+"""
+
+CYPHER_ORGANISM = """
+MATCH (p:Protein {id_protein: $id_protein})
+UNWIND $rows AS row
+WITH p, row WHERE row.text IN $targets
+MERGE (o:Organism {taxonomy_id: $taxonomy_id})
+ON CREATE SET o.name = row.text
+MERGE (p)-[:IN_ORGANISM]->(o)
+"""
 
 
 class XMLImporter:
@@ -19,7 +131,13 @@ class XMLImporter:
         user (str): Username of the Neo4j database.
         password (str): Password of the Neo4j database.
         database (str): Name of the Neo4j database.
-        data (dict): Parsed data from the XML file.
+        driver (AsyncDriver): Driver shared by every insert.
+        genes (list): Gene names, as dicts with type and text.
+        features (list): Features, as dicts with type, description and position.
+        references (list): References, as dicts with id, type, name and authors.
+        fullnames (list): Recommended full names of the proteins.
+        organisms (list): Organism names, as dicts with type and text.
+        apoc (bool): Whether the database provides apoc.periodic.iterate.
 
     """
 
@@ -29,257 +147,393 @@ class XMLImporter:
         self.user = user
         self.password = password
         self.database = database
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(
+                self.user,
+                self.password
+            ),
+            max_connection_pool_size=32,
+            connection_acquisition_timeout=30,
+            max_connection_lifetime=1800,
+            keep_alive=True
+        )
+        self.apoc = False
 
     def load_file(self) -> None:
         """
-        Loads the XML file and parses it using xmltodict.
-        """
-        with open(self.file, 'r', encoding='utf-8') as xml_file:
-            self.data = xd.parse(xml_file.read())
+        Streams the XML file with lxml and extracts only the fields used by
+        the inserts with precompiled XPath expressions, clearing each
+        element once it has been read.
 
-    def open_database(self) -> GraphDatabase.driver:
+        The path is handed to libxml2, which reads the raw bytes and
+        honours the encoding declaration itself, so the file is never
+        decoded into a Python string.
         """
-        Opens a connection to the Neo4j database and returns a driver object.
+        self.genes = []
+        self.features = []
+        self.references = []
+        self.fullnames = []
+        self.organisms = []
+
+        tags = [NS + 'gene', NS + 'feature', NS + 'reference', NS + 'protein', NS + 'organism']
+        for _, elem in etree.iterparse(self.file, tag=tags):
+            if elem.tag == NS + 'gene':
+                self.genes.extend(
+                    {'type': name.get('type'), 'text': name.text} for name in XPATH_NAMES(elem)
+                )
+            elif elem.tag == NS + 'feature':
+                position = XPATH_POSITION(elem)
+                self.features.append({
+                    'type': elem.get('type'),
+                    'description': elem.get('description'),
+                    'position': position[0] if position else None
+                })
+            elif elem.tag == NS + 'reference':
+                self.references.append({
+                    'id': elem.get('key', ""),
+                    'type': XPATH_CITATION_TYPE(elem),
+                    'name': XPATH_CITATION_NAME(elem),
+                    'authors': XPATH_AUTHORS(elem)
+                })
+            elif elem.tag == NS + 'protein':
+                self.fullnames.extend(XPATH_FULLNAME(elem))
+            elif elem.tag == NS + 'organism':
+                self.organisms.extend(
+                    {'type': name.get('type'), 'text': name.text} for name in XPATH_NAMES(elem)
+                )
 
-        Returns:
-            GraphDatabase.driver: The driver object.
+            elem.clear(keep_tail=True)
 
+    async def close_database(self) -> None:
         """
-        driver = GraphDatabase.driver(
-            self.uri,
-            auth=(
-                self.user,
-                self.password
-            ),
-            database=self.database
-        )
-        return driver
+        Closes the driver and its connection pool.
+        """
+        await self.driver.close()
 
-    def close_database(self, driver: GraphDatabase.driver) -> None:
+    async def create_indexes(self, session: AsyncSession) -> None:
         """
-        Closes the connection to the Neo4j database.
+        Creates the indexes backing the MATCH and MERGE lookups.
 
         Args:
-            driver (GraphDatabase.driver): The driver object.
+            session (AsyncSession): Open session on the target database.
 
         """
-        driver.close()
+        for query in CYPHER_INDEXES:
+            await session.run(query)
 
-    def insert_protein(self) -> None:
-        """
-        Inserts protein data from the XML file into the Neo4j database.
+    async def has_apoc(self, session: AsyncSession) -> bool:
         """
-        driver = self.open_database()
-
-        query = "CREATE (p:Protein {id_protein: $id_protein})"
+        Checks whether the APOC periodic procedures are installed.
 
-        with driver.session() as session:
-            id_protein = "Q9Y261"
-            session.run(query, id_protein=id_protein)
+        Args:
+            session (AsyncSession): Open session on the target database.
 
-        self.close_database(driver)
+        Returns:
+            bool: True if apoc.periodic.iterate can be called.
 
-    def insert_gene(self) -> None:
         """
-        Inserts gene data from the XML file into the Neo4j database.
+        try:
+            result = await session.run(CYPHER_APOC_HELP)
+            await result.consume()
+        except ClientError:
+            return False
+        return True
+
+    async def run_batched(self, tx: AsyncManagedTransaction, query: str, **params) -> None:
         """
-        driver = self.open_database()
-
-        query = "CREATE (g:Gene {name: $name})"
-        query_relationship = """
-        MATCH (p:Protein {id_protein: $id_protein})
-        MATCH (g:Gene {name: $name})
-        CREATE (p)-[:FROM_GENE]->(g)
-        """
-
-        with driver.session() as session:
-            for gene in self.data['uniprot']['entry']['gene']['name']:
-                if (
-                    gene['@type'] == 'synonym' and gene['#text'] == 'HNF3B'
-                ) or (
-                    gene['@type'] == 'primary' and gene['#text'] == 'FOXA2'
-                ):
-                    name = gene['#text']
-                    session.run(
-                        query,
-                        name=name
-                    )
-                    session.run(
-                        query_relationship,
-                        id_protein='Q9Y261',
-                        name=name
-                    )
-
-        self.close_database(driver)
-
-    def insert_feature(self) -> None:
+        Runs a query once per element of the rows parameter, bound as row,
+        with the Protein node matched once up front and bound as p.
+
+        Uses apoc.periodic.iterate when available so large row lists are
+        committed in batches, and falls back to a plain UNWIND otherwise.
+
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
+            query (str): Cypher statement applied to each row.
+            **params: Query parameters, including rows and id_protein.
+
         """
-        Inserts feature data from the XML file into the Neo4j database.
+        if self.apoc:
+            result = await tx.run(
+                CYPHER_APOC_ITERATE,
+                query=query,
+                params=params
+            )
+            summary = await result.single()
+            if summary['failedOperations']:
+                raise RuntimeError(summary['errorMessages'])
+        else:
+            await tx.run(CYPHER_PROTEIN_ROWS + query, **params)
+
+    async def insert_protein(self, tx: AsyncManagedTransaction) -> None:
         """
-        driver = self.open_database()
+        Inserts protein data from the XML file into the Neo4j database.
+
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
 
-        query = "CREATE (f:Feature {name: $name, type: $type})"
-        query_relationship = """
-        MATCH (p:Protein {id_protein: $id_protein})
-        MATCH (f:Feature {name: $name, type: $type})
-        CREATE (p)-[:HAS_FEATURE]->(f)
         """
+        id_protein = "Q9Y261"
+        await tx.run(CYPHER_PROTEIN, id_protein=id_protein)
 
-        with driver.session() as session:
-            for feature in self.data['uniprot']['entry']['feature']:
-                if (feature['location'].get('position', {}).get('@position') == '307'):
-                    name = feature['@description']
-                    type = feature['@type']
+    async def insert_gene(self, tx: AsyncManagedTransaction) -> None:
+        """
+        Inserts gene data from the XML file into the Neo4j database.
 
-                    if (name == 'Phosphoserine') and (type == 'modified residue'):
-                        session.run(query, name=name, type=type)
-                        session.run(
-                            query_relationship,
-                            id_protein='Q9Y261',
-                            name=name,
-                            type=type
-                        )
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
 
-        self.close_database(driver)
+        """
+        if not self.genes:
+            return
+
+        await tx.run(
+            CYPHER_GENE,
+            rows=self.genes,
+            targets=list(GENE_TARGETS),
+            id_protein='Q9Y261'
+        )
 
-    def insert_reference(self) -> None:
+    async def insert_feature(self, tx: AsyncManagedTransaction) -> None:
         """
-        Inserts reference data from the XML file into the Neo4j database.
+        Inserts feature data from the XML file into the Neo4j database.
+
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
+
         """
-        driver = self.open_database()
+        if not self.features:
+            return
+
+        await self.run_batched(
+            tx,
+            CYPHER_FEATURE,
+            rows=self.features,
+            position=FEATURE_POSITION,
+            targets=list(FEATURE_TARGETS),
+            id_protein='Q9Y261'
+        )
 
-        query = "CREATE (r:Reference {id: $id, type: $type, name: $name})"
-        query_relationship = """
-        MATCH (p:Protein {id_protein: $id_protein})
-        MATCH (r:Reference {id: $id, type: $type, name: $name})
-        CREATE (p)-[:HAS_REFERENCE]->(r)
+    async def insert_reference(self, tx: AsyncManagedTransaction) -> None:
         """
+        Inserts reference data from the XML file into the Neo4j database,
+        together with the authors of each reference.
 
-        with driver.session() as session:
-            for reference in self.data['uniprot']['entry']['reference']:
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
 
-                id = ""
-                type = ""
-                name = ""
+        """
+        rows = [reference for reference in self.references if reference['id']]
+        if not rows:
+            return
 
-                if '@key' in reference:
-                    id = reference['@key']
+        await self.run_batched(tx, CYPHER_REFERENCE, rows=rows, id_protein='Q9Y261')
 
-                if reference.get('citation', {}).get('@type') is not None:
-                    type = reference['citation']['@type']
+    async def insert_fullname(self, tx: AsyncManagedTransaction) -> None:
+        """
+        Inserts fullname data from the XML file into the Neo4j database.
 
-                if reference.get('citation', {}).get('@name') is not None:
-                    name = reference['citation']['@name']
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
 
-                session.run(query, id=id, type=type, name=name)
-                session.run(
-                    query_relationship,
-                    id_protein='Q9Y261',
-                    id=id,
-                    type=type,
-                    name=name
-                )
+        """
+        if not self.fullnames:
+            return
+
+        await tx.run(
+            CYPHER_FULLNAME,
+            rows=self.fullnames,
+            targets=list(FULLNAME_TARGETS),
+            id_protein='Q9Y261'
+        )
 
-                if 'authorList' in reference['citation']:
-                    authorList = reference['citation']['authorList']
-                    self.insert_author(authorList, id, type, name)
+    async def insert_organism(self, tx: AsyncManagedTransaction) -> None:
+        """
+        Inserts organism data from the XML file into the Neo4j database.
 
-        self.close_database(driver)
+        Args:
+            tx (AsyncManagedTransaction): Transaction the insert runs in.
 
-    def insert_author(self, authorList, id, type, author) -> None:
-        """
-        Inserts author data from the XML file into the Neo4j database.
         """
-        driver = self.open_database()
+        if not self.organisms:
+            return
+
+        await tx.run(
+            CYPHER_ORGANISM,
+            rows=self.organisms,
+            targets=list(ORGANISM_TARGETS),
+            taxonomy_id=ORGANISM_TAXONOMY_ID,
+            id_protein='Q9Y261'
+        )
 
-        query = "CREATE (a:Author {name: $name})"
-        query_relationship = """
-        MATCH (r:Reference {id: $id, type: $type, name: $author})
-        MATCH (a:Author {name: $name})
-        CREATE (r)-[:HAS_AUTHOR]->(a)
+    async def write(self, insert) -> None:
         """
+        Runs an insert in its own session and write transaction.
 
-        with driver.session() as session:
-            if 'person' in authorList:
-                for person in authorList['person']:
-                    name = person['@name']
-                    session.run(query, name=name)
-                    session.run(
-                        query_relationship,
-                        id=id,
-                        type=type,
-                        author=author,
-                        name=name
-                    )
+        Args:
+            insert (callable): Insert coroutine taking a transaction.
 
-        self.close_database(driver)
+        """
+        async with self.driver.session(database=self.database) as session:
+            await session.execute_write(insert)
 
-    def insert_fullname(self) -> None:
+    async def prepare_database(self) -> None:
         """
-        Inserts fullname data from the XML file into the Neo4j database.
+        Creates the indexes, detects APOC and writes the Protein node that
+        every other insert attaches to.
         """
-        driver = self.open_database()
-
-        query = "CREATE (f:FullName {name: $name})"
-        query_relationship = """
-        MATCH (p:Protein {id_protein: $id_protein})
-        MATCH (f:FullName {name: $name})
-        CREATE (p)-[:HAS_FULL_NAME]->(f)
-        """
-
-        with driver.session() as session:
-            if (
-                self.data['uniprot']['entry']['protein']['recommendedName']['fullName'] == "Hepatocyte nuclear factor 3-beta"
-            ):
-                name = self.data['uniprot']['entry']['protein']['recommendedName']['fullName']
-                session.run(query, name=name)
-                session.run(
-                    query_relationship,
-                    id_protein='Q9Y261',
-                    name=name
-                )
+        async with self.driver.session(database=self.database) as session:
+            await self.create_indexes(session)
+            self.apoc = await self.has_apoc(session)
+            await session.execute_write(self.insert_protein)
+
+    def to_csv(self, directory: str) -> None:
+        """
+        Writes the parsed records as CSV files for neo4j-admin import,
+        applying the same selection as the Cypher inserts.
 
-        self.close_database(driver)
+        Args:
+            directory (str): Directory the CSV files are written to.
 
-    def insert_organism(self) -> None:
         """
-        Inserts organism data from the XML file into the Neo4j database.
+        id_protein = "Q9Y261"
+        genes = [
+            gene['text'] for gene in self.genes
+            if (gene['type'], gene['text']) in GENE_TARGETS
+        ]
+        features = [
+            (feature['description'], feature['type']) for feature in self.features
+            if feature['position'] == FEATURE_POSITION
+            and (feature['description'], feature['type']) in FEATURE_TARGETS
+        ]
+        references = [reference for reference in self.references if reference['id']]
+        authors = [
+            (reference['id'], author)
+            for reference in references
+            for author in reference['authors']
+        ]
+        fullnames = [name for name in self.fullnames if name in FULLNAME_TARGETS]
+        organisms = [
+            organism['text'] for organism in self.organisms
+            if organism['text'] in ORGANISM_TARGETS
+        ]
+
+        # neo4j-admin rejects duplicate node ids, while MERGE would dedupe them.
+        tables = {
+            'proteins.csv': (['id_protein:ID(Protein)'], [[id_protein]]),
+            'genes.csv': (['name:ID(Gene)'], [[name] for name in dict.fromkeys(genes)]),
+            'features.csv': (
+                [':ID(Feature)', 'name', 'type'],
+                [[name + '|' + type, name, type] for name, type in dict.fromkeys(features)]
+            ),
+            'references.csv': (
+                ['id:ID(Reference)', 'type', 'name'],
+                [
+                    [reference['id'], reference['type'], reference['name']]
+                    for reference in {reference['id']: reference for reference in references}.values()
+                ]
+            ),
+            'authors.csv': (
+                ['name:ID(Author)'],
+                [[name] for name in dict.fromkeys(author for _, author in authors)]
+            ),
+            'fullnames.csv': (['name:ID(FullName)'], [[name] for name in dict.fromkeys(fullnames)]),
+            'organisms.csv': (
+                ['taxonomy_id:ID(Organism)', 'name'],
+                [[ORGANISM_TAXONOMY_ID, organisms[0]]] if organisms else []
+            ),
+            'from_gene.csv': (
+                [':START_ID(Protein)', ':END_ID(Gene)'],
+                [[id_protein, name] for name in dict.fromkeys(genes)]
+            ),
+            'has_feature.csv': (
+                [':START_ID(Protein)', ':END_ID(Feature)'],
+                [[id_protein, name + '|' + type] for name, type in dict.fromkeys(features)]
+            ),
+            'has_reference.csv': (
+                [':START_ID(Protein)', ':END_ID(Reference)'],
+                [[id_protein, id] for id in dict.fromkeys(reference['id'] for reference in references)]
+            ),
+            'has_author.csv': (
+                [':START_ID(Reference)', ':END_ID(Author)'],
+                [[id, name] for id, name in dict.fromkeys(authors)]
+            ),
+            'has_full_name.csv': (
+                [':START_ID(Protein)', ':END_ID(FullName)'],
+                [[id_protein, name] for name in dict.fromkeys(fullnames)]
+            ),
+            'in_organism.csv': (
+                [':START_ID(Protein)', ':END_ID(Organism)'],
+                [[id_protein, ORGANISM_TAXONOMY_ID]] if organisms else []
+            )
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        for filename, (header, rows) in tables.items():
+            with open(os.path.join(directory, filename), 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(header)
+                writer.writerows(rows)
+
+    def bulk_import(self, directory: str) -> None:
         """
-        driver = self.open_database()
+        Loads the CSV files written by to_csv with neo4j-admin import.
 
-        query = "CREATE (f:Organism {name: $name, taxonomy_id: $taxonomy_id})"
-        query_relationship = """
-        MATCH (p:Protein {id_protein: $id_protein})
-        MATCH (o:Organism {name: $name, taxonomy_id: $taxonomy_id})
-        CREATE (p)-[:IN_ORGANISM]->(o)
-        """
+        This is an offline import for a new, empty database: it has to run
+        on the Neo4j host, with the target database stopped.
 
-        with driver.session() as session:
-            for organism in self.data['uniprot']['entry']['organism']['name']:
-                if (
-                    organism['#text'] == 'Homo sapiens'
-                ):
-                    name = organism['#text']
-                    taxonomy_id = "9606"
-                    session.run(query, name=name, taxonomy_id=taxonomy_id)
-                    session.run(
-                        query_relationship,
-                        id_protein='Q9Y261',
-                        name=name,
-                        taxonomy_id=taxonomy_id
-                    )
+        Args:
+            directory (str): Directory holding the CSV files.
 
-        self.close_database(driver)
+        """
+        command = ['neo4j-admin', 'database', 'import', 'full']
+        command += [
+            f'--nodes={label}={os.path.join(directory, filename)}'
+            for label, filename in CSV_NODES
+        ]
+        command += [
+            f'--relationships={type}={os.path.join(directory, filename)}'
+            for type, filename in CSV_RELATIONSHIPS
+        ]
+        command.append(self.database)
+
+        subprocess.run(command, check=True)
+
+    async def run(self, mode: str = 'bolt', import_dir: str = './import') -> None:
+        """
+        Imports the XML file into the Neo4j database.
 
-    def run(self) -> None:
-        self.load_file()
+        Args:
+            mode (str): 'bolt' to write through the driver, or 'bulk' to
+                write CSV files and load them with neo4j-admin import.
+            import_dir (str): Directory for the CSV files in 'bulk' mode.
 
-        self.insert_protein()
-        self.insert_gene()
-        self.insert_feature()
-        self.insert_reference()
-        self.insert_fullname()
-        self.insert_organism()
+        """
+        if mode not in ('bolt', 'bulk'):
+            raise ValueError(f"Unknown import mode: {mode}")
+
+        try:
+            if mode == 'bulk':
+                self.load_file()
+                self.to_csv(import_dir)
+                self.bulk_import(import_dir)
+                return
+
+            await asyncio.gather(
+                asyncio.to_thread(self.load_file),
+                self.prepare_database()
+            )
+
+            await asyncio.gather(
+                self.write(self.insert_gene),
+                self.write(self.insert_feature),
+                self.write(self.insert_reference),
+                self.write(self.insert_fullname),
+                self.write(self.insert_organism)
+            )
+        finally:
+            await self.close_database()
 
 
 file = "./data/Q9Y261.xml"
@@ -288,5 +542,66 @@ user = "neo4j"
 password = "123456789"
 database = "pixaflow"
 
-importer = XMLImporter(file, uri, user, password, database)
-importer.run()
+
+def parse_xml() -> dict:
+    """
+    Airflow task that parses the XML file.
+
+    Returns:
+        dict: The extracted records, pushed to XCom for the insert tasks.
+
+    """
+    importer = XMLImporter(file, uri, user, password, database)
+    importer.load_file()
+    asyncio.run(importer.close_database())
+    return {
+        'genes': importer.genes,
+        'features': importer.features,
+        'references': importer.references,
+        'fullnames': importer.fullnames,
+        'organisms': importer.organisms
+    }
+
+
+async def run_insert(label: str, records: dict) -> None:
+    """
+    Runs a single insert against the database with already parsed records.
+
+    Args:
+        label (str): Insert to run, e.g. 'protein' or 'gene'.
+        records (dict): Records returned by parse_xml.
+
+    """
+    importer = XMLImporter(file, uri, user, password, database)
+    importer.genes = records['genes']
+    importer.features = records['features']
+    importer.references = records['references']
+    importer.fullnames = records['fullnames']
+    importer.organisms = records['organisms']
+
+    try:
+        if label == 'protein':
+            await importer.prepare_database()
+        else:
+            async with importer.driver.session(database=importer.database) as session:
+                importer.apoc = await importer.has_apoc(session)
+            await importer.write(getattr(importer, f'insert_{label}'))
+    finally:
+        await importer.close_database()
+
+
+def insert(label: str, ti) -> None:
+    """
+    Airflow task that runs one insert using the records from parse_xml.
+
+    Args:
+        label (str): Insert to run, e.g. 'protein' or 'gene'.
+        ti (TaskInstance): Airflow task instance, used to pull the XCom.
+
+    """
+    asyncio.run(run_insert(label, ti.xcom_pull(task_ids='parse_xml')))
+
+
+if __name__ == '__main__':
+    importer = XMLImporter(file, uri, user, password, database)
+    asyncio.run(importer.run())